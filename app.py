@@ -1,14 +1,32 @@
-from flask import Flask, request, jsonify, render_template
+import json
+import os
+
+import pandas as pd
+from flask import Flask, Response, request, jsonify, make_response, render_template, stream_with_context
+from jinja2 import FileSystemBytecodeCache
 from src.ingest import get_stock_data
 from src.predict import arima_forecast
 from src.llm import generate_financial_summary
-from src.bank_ingest import parse_statement_csv
-from src.pdf_ingest import parse_statement_pdf
-from src.categorize import categorize_transactions
-from src.insights import generate_statement_insights
+from src.categorize import RULESET_VERSION, categorize_transactions, rule_categories
+from src.classifier import classifier_version, load_classifier, predict_categories, train_classifier
+from src.pipeline import analyze_statement, parse_statement_file
+from src.indicators import INDICATORS, indicator_cache
+from src.cashflow import FREQUENCIES, forecast_cashflow
+from src.response_cache import ResponseCache, fingerprint
 
 app = Flask(__name__)
 
+# Bytecode dos templates compilados em disco, compartilhado entre workers/processos.
+# Sem TEMPLATE_CACHE_DIR o Jinja usa um diretório temporário padrão por usuário.
+_template_cache_dir = os.getenv("TEMPLATE_CACHE_DIR")
+if _template_cache_dir:
+    os.makedirs(_template_cache_dir, exist_ok=True)
+app.jinja_options = {**app.jinja_options, "bytecode_cache": FileSystemBytecodeCache(_template_cache_dir)}
+
+# Respostas de /statement já renderizadas, por (arquivo, versão das regras, formato)
+statement_cache = ResponseCache()
+cashflow_cache = ResponseCache()
+
 
 @app.route("/fetch")
 def fetch():
@@ -21,6 +39,24 @@ def fetch():
     return jsonify({"symbol": symbol, "last_close": last["close"].round(2).to_dict()})
 
 
+def _analysis_series(df):
+    close = df["close"].dropna()
+    # Para estabilidade, usamos apenas os últimos 200 pontos se existirem
+    return close[-200:]
+
+
+def _analysis_text(symbol, df, series):
+    """Constrói um texto simples para o LLM a partir dos preços e indicadores."""
+    # Indicadores memoizados por símbolo (recalcula apenas as barras novas)
+    sma20 = indicator_cache.compute(symbol, df, "sma", window=20)["sma"].iloc[-1]
+    rsi14 = indicator_cache.compute(symbol, df, "rsi", period=14)["rsi"].iloc[-1]
+    return (
+        f"Símbolo: {symbol}. Último preço: {series.iloc[-1]:.2f}. "
+        f"Média (últimos 20): {sma20:.2f}. Última tendência (últimos 5): {series[-5:].pct_change().mean():.4f}. "
+        f"RSI (14): {rsi14:.2f}"
+    )
+
+
 @app.route("/analysis")
 def analysis():
     symbol = request.args.get("symbol", "IBM")
@@ -30,17 +66,9 @@ def analysis():
     if df.empty:
         return jsonify({"error": "Dados não disponíveis"}), 400
 
-    close = df["close"].dropna()
-    # Para estabilidade, usamos apenas os últimos 200 pontos se existirem
-    series = close[-200:]
-
+    series = _analysis_series(df)
     forecast, conf_int = arima_forecast(series, steps=steps)
-
-    # Construir um texto simples para o LLM
-    text_input = (
-        f"Símbolo: {symbol}. Último preço: {series.iloc[-1]:.2f}. "
-        f"Média (últimos 20): {series[-20:].mean():.2f}. Última tendência (últimos 5): {series[-5:].pct_change().mean():.4f}"
-    )
+    text_input = _analysis_text(symbol, df, series)
 
     llm_summary = generate_financial_summary(text_input)
 
@@ -52,6 +80,192 @@ def analysis():
     })
 
 
+@app.route("/analysis/stream")
+def analysis_stream():
+    """Versão em streaming de /analysis.
+
+    Envia cada etapa assim que concluída: preços, previsão ARIMA e os fragmentos do LLM.
+    Falhas geram um evento `error`; o stream sempre termina com `done`.
+    Usa Server-Sent Events por padrão; com `Accept: application/x-ndjson` envia uma linha
+    JSON por evento.
+    """
+    symbol = request.args.get("symbol", "IBM")
+    try:
+        steps = int(request.args.get("steps", 5))
+    except ValueError:
+        return jsonify({"error": "steps deve ser um inteiro"}), 400
+    if steps < 1:
+        return jsonify({"error": "steps deve ser >= 1"}), 400
+    ndjson = request.accept_mimetypes.best == "application/x-ndjson"
+
+    def event(name, data):
+        if ndjson:
+            return json.dumps({"event": name, "data": data}) + "\n"
+        return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+    def generate():
+        # Primeiro evento imediato para o cliente não aguardar a busca de dados
+        yield event("start", {"symbol": symbol})
+        try:
+            df = get_stock_data(symbol=symbol, interval="60min", outputsize="compact")
+        except Exception as e:
+            yield event("error", {"error": str(e)})
+            yield event("done", {})
+            return
+        if df.empty:
+            yield event("error", {"error": "Dados não disponíveis"})
+            yield event("done", {})
+            return
+
+        series = _analysis_series(df)
+        last = series.tail(20).round(2)
+        yield event("prices", {"symbol": symbol, "last_close": {ts.isoformat(): v for ts, v in last.items()}})
+
+        try:
+            forecast, conf_int = arima_forecast(series, steps=steps)
+        except Exception as e:
+            yield event("error", {"error": str(e)})
+            yield event("done", {})
+            return
+        yield event("forecast", {
+            "forecast": {str(k): v for k, v in forecast.round(2).items()},
+            "conf_int": [[str(k), *row] for k, row in zip(conf_int.index, conf_int.round(2).values.tolist())],
+        })
+
+        try:
+            for token in generate_financial_summary(_analysis_text(symbol, df, series), stream=True):
+                yield event("token", {"text": token})
+        except Exception as e:
+            yield event("error", {"error": str(e)})
+        yield event("done", {})
+
+    mimetype = "application/x-ndjson" if ndjson else "text/event-stream"
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return Response(stream_with_context(generate()), mimetype=mimetype, headers=headers)
+
+
+@app.route("/indicators")
+def indicators():
+    """Indicadores técnicos para um ou mais símbolos (ex.: ?symbols=IBM,MSFT&names=sma,rsi&tail=5)."""
+    symbols = [s.strip() for s in request.args.get("symbols", "IBM").split(",") if s.strip()]
+    names = [n.strip() for n in request.args.get("names", ",".join(INDICATORS)).split(",") if n.strip()]
+    try:
+        tail = int(request.args.get("tail", 1))
+    except ValueError:
+        return jsonify({"error": "tail deve ser um inteiro"}), 400
+    tail = max(tail, 1)
+
+    unknown = [n for n in names if n not in INDICATORS]
+    if unknown:
+        return jsonify({"error": f"Indicadores desconhecidos: {', '.join(unknown)}"}), 400
+
+    frames = {}
+    for symbol in symbols:
+        df = get_stock_data(symbol=symbol, interval="60min", outputsize="compact")
+        if not df.empty:
+            frames[symbol] = df
+    if not frames:
+        return jsonify({"error": "Dados não disponíveis"}), 400
+
+    out = {symbol: {} for symbol in frames}
+    for name in names:
+        for symbol, res in indicator_cache.compute_many(frames, name).items():
+            out[symbol][name] = {
+                col: {ts.isoformat(): round(float(v), 4) for ts, v in res[col].dropna().tail(tail).items()}
+                for col in res.columns
+            }
+
+    return jsonify(out)
+
+
+@app.route("/categorize", methods=["POST"])
+def categorize_bulk():
+    """Categoriza um lote de descrições: {"descriptions": ["...", ...]}.
+
+    Regras de keywords primeiro; as descrições não reconhecidas passam pelo classificador
+    local em uma única chamada vetorizada.
+    """
+    payload = request.get_json(silent=True) or {}
+    descriptions = payload.get("descriptions")
+    if not isinstance(descriptions, list):
+        return jsonify({"error": "Envie JSON com a lista 'descriptions'"}), 400
+
+    desc = pd.Series(descriptions, dtype=object)
+    categories = rule_categories(desc)
+    source = pd.Series("regra", index=desc.index, dtype=object)
+    missing = categories == "outros"
+    source[missing] = "nenhuma"
+
+    model = load_classifier()
+    if model is not None and missing.any():
+        predicted = predict_categories(model, desc[missing])
+        categories[missing] = predicted
+        source[missing & (categories != "outros")] = "modelo"
+
+    return jsonify({
+        "categories": categories.tolist(),
+        "source": source.tolist(),
+        "model_available": model is not None,
+    })
+
+
+@app.route("/categorize/train", methods=["POST"])
+def categorize_train():
+    """Treina o classificador com um histórico categorizado.
+
+    Corpo JSON: {"transactions": [{"description": "...", "category": "..."}, ...]}.
+    Transações sem categoria recebem a categoria das regras quando houver.
+    """
+    payload = request.get_json(silent=True) or {}
+    transactions = payload.get("transactions")
+    if not isinstance(transactions, list) or not transactions:
+        return jsonify({"error": "Envie JSON com a lista 'transactions'"}), 400
+
+    ledger = pd.DataFrame(transactions)
+    if "description" not in ledger.columns:
+        return jsonify({"error": "Transações precisam do campo 'description'"}), 400
+    rules = rule_categories(ledger["description"])
+    if "category" in ledger.columns:
+        ledger["category"] = ledger["category"].fillna(rules)
+    else:
+        ledger["category"] = rules
+
+    try:
+        model = train_classifier(ledger)
+    except ImportError as e:
+        return jsonify({"error": str(e)}), 400
+    if model is None:
+        return jsonify({"error": "São necessárias ao menos duas categorias (diferentes de 'outros') para treinar"}), 400
+
+    return jsonify({
+        "trained_rows": int((ledger["category"] != "outros").sum()),
+        "classes": [str(c) for c in model.classes_],
+        "ruleset_version": RULESET_VERSION,
+    })
+
+
+def _cached_response(cache, etag):
+    """Resposta 304 ou corpo em cache para o ETag, ou None se for preciso processar."""
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    else:
+        cached = cache.get(etag)
+        if cached is None:
+            return None
+        body, mimetype = cached
+        resp = Response(body, mimetype=mimetype)
+    resp.set_etag(etag)
+    resp.vary.add("Accept")
+    return resp
+
+
+def _store_response(cache, etag, resp):
+    cache.set(etag, resp.get_data(), resp.mimetype)
+    resp.set_etag(etag)
+    resp.vary.add("Accept")
+    return resp
+
+
 @app.route("/statement", methods=["POST"])
 def statement():
     """Recebe um CSV ou PDF de extrato bancário via upload multipart/form-data (campo 'file').
@@ -63,55 +277,85 @@ def statement():
     f = request.files["file"]
     # Ler conteúdo em memória e parsear conforme extensão
     filename = (f.filename or "").lower()
+
+    # Negociar o formato antes do processamento para poder responder do cache
+    best = request.accept_mimetypes.best_match(["application/json", "text/html"])
+    wants_html = best == "text/html" and request.accept_mimetypes["text/html"] >= request.accept_mimetypes["application/json"]
+    output_format = "html" if wants_html else "json"
+
+    raw = f.read()
+    f.seek(0)
+    etag = fingerprint(raw, os.path.splitext(filename)[1], RULESET_VERSION, classifier_version(), output_format)
+    cached = _cached_response(statement_cache, etag)
+    if cached is not None:
+        return cached
+
     try:
-        if filename.endswith(".pdf"):
-            df = parse_statement_pdf(f)
-        elif filename.endswith(".ofx") or filename.endswith(".qfx"):
-            # OFX/QFX
-            from src.ofx_ingest import parse_statement_ofx
-
-            df = parse_statement_ofx(f)
-        elif filename.endswith(".qif"):
-            from src.qif_ingest import parse_statement_qif
-
-            df = parse_statement_qif(f)
-        else:
-            # tratar como CSV por padrão
-            df = parse_statement_csv(f)
+        df = parse_statement_file(f, filename)
     except Exception as e:
         return jsonify({"error": f"Falha ao parsear arquivo: {e}"}), 400
 
     if df.empty:
         return jsonify({"error": "Nenhuma transação detectada no arquivo."}), 400
 
-    cat_df = categorize_transactions(df)
-    insights = generate_statement_insights(cat_df)
-
-    # Breve resumo: total gasto e top categorias
-    total_spent = float(cat_df[cat_df["amount"] < 0]["amount"].abs().sum())
-    income = float(cat_df[cat_df["amount"] > 0]["amount"].sum())
-
-    result = {
-        "total_spent": round(total_spent, 2),
-        "income": round(income, 2),
-        "category_summary": insights["category_summary"],
-        "rule_suggestions": insights["rule_suggestions"],
-        "llm_suggestion": insights.get("llm_suggestion", ""),
-    }
+    _, result = analyze_statement(df)
 
     # Se o cliente aceita HTML (ex.: navegador), renderizar template
-    best = request.accept_mimetypes.best_match(["application/json", "text/html"])
-    if best == "text/html" and request.accept_mimetypes["text/html"] >= request.accept_mimetypes["application/json"]:
-        return render_template(
+    if wants_html:
+        resp = make_response(render_template(
             "statement_result.html",
             total_spent=result["total_spent"],
             income=result["income"],
             category_summary=result["category_summary"],
             rule_suggestions=result["rule_suggestions"],
             llm_suggestion=result["llm_suggestion"],
-        )
+        ))
+    else:
+        resp = jsonify(result)
+
+    return _store_response(statement_cache, etag, resp)
+
+
+@app.route("/cashflow", methods=["POST"])
+def cashflow():
+    """Projeção de fluxo de caixa a partir de um extrato enviado (campo 'file').
+
+    Parâmetros: freq (D ou W), steps (períodos à frente) e balance (saldo atual).
+    """
+    if "file" not in request.files:
+        return jsonify({"error": "Envie o arquivo CSV/PDF no campo 'file'"}), 400
+
+    freq = request.args.get("freq", "W").upper()
+    try:
+        steps = int(request.args.get("steps", 4))
+        balance = float(request.args.get("balance", 0))
+    except ValueError:
+        return jsonify({"error": "steps e balance devem ser numéricos"}), 400
+    if freq not in FREQUENCIES:
+        return jsonify({"error": f"freq deve ser um de: {', '.join(FREQUENCIES)}"}), 400
+    if steps < 1:
+        return jsonify({"error": "steps deve ser >= 1"}), 400
+
+    f = request.files["file"]
+    filename = (f.filename or "").lower()
+    raw = f.read()
+    f.seek(0)
+    # Versão do histórico: conteúdo do arquivo + regras + classificador, mais os parâmetros
+    etag = fingerprint(raw, os.path.splitext(filename)[1], RULESET_VERSION, classifier_version(), freq, str(steps), str(balance))
+    cached = _cached_response(cashflow_cache, etag)
+    if cached is not None:
+        return cached
+
+    try:
+        df = parse_statement_file(f, filename)
+    except Exception as e:
+        return jsonify({"error": f"Falha ao parsear arquivo: {e}"}), 400
+
+    if df.empty or df["date"].isna().all():
+        return jsonify({"error": "Nenhuma transação com data detectada no arquivo."}), 400
 
-    return jsonify(result)
+    result = forecast_cashflow(categorize_transactions(df), freq=freq, steps=steps, starting_balance=balance)
+    return _store_response(cashflow_cache, etag, jsonify(result))
 
 
 if __name__ == "__main__":
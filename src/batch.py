@@ -0,0 +1,217 @@
+"""Processamento em lote de extratos, sem passar pela API HTTP.
+
+Uso:
+    python -m src.batch extratos/ outros/extrato.ofx --output-dir resultados --workers 8
+
+Percorre os diretórios, executa o mesmo pipeline de /statement (parse -> categorização ->
+insights) em um pool de processos e grava:
+    - summaries.jsonl: um resumo por arquivo
+    - transactions/<id>.parquet: transações categorizadas, um arquivo por extrato
+      (com --format jsonl: transactions-<execução>.jsonl)
+    - manifest.jsonl: arquivos já processados e onde estão suas transações, usado para
+      retomar execuções interrompidas
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except Exception:
+    pa = None
+
+from .pipeline import STATEMENT_EXTENSIONS, analyze_statement, parse_statement_file
+
+MANIFEST_NAME = "manifest.jsonl"
+SUMMARIES_NAME = "summaries.jsonl"
+
+
+def find_statement_files(paths: list) -> list:
+    """Lista (ordenada) dos arquivos de extrato encontrados nos caminhos informados."""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in files:
+                    if name.lower().endswith(STATEMENT_EXTENSIONS):
+                        found.append(os.path.join(root, name))
+        elif os.path.isfile(path):
+            found.append(path)
+    return sorted(set(os.path.abspath(p) for p in found))
+
+
+def _file_key(path: str) -> str:
+    """Identifica a versão do arquivo (caminho, tamanho e mtime) para o manifesto."""
+    st = os.stat(path)
+    return f"{path}:{st.st_size}:{st.st_mtime_ns}"
+
+
+def load_manifest(path: str) -> set:
+    """Chaves dos arquivos já processados (com sucesso ou sem transações)."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # linha incompleta de uma execução interrompida
+                continue
+            if entry.get("status") in ("ok", "empty"):
+                done.add(entry["key"])
+    return done
+
+
+def process_file(path: str, use_llm: bool = False) -> dict:
+    """Executa o pipeline de um arquivo (roda dentro do processo worker)."""
+    start = time.perf_counter()
+    try:
+        with open(path, "rb") as fh:
+            df = parse_statement_file(fh, path)
+        if df.empty:
+            return {"path": path, "status": "empty", "rows": 0, "seconds": time.perf_counter() - start}
+        cat_df, result = analyze_statement(df, use_llm=use_llm)
+    except Exception as e:
+        return {"path": path, "status": "error", "error": str(e), "rows": 0, "seconds": time.perf_counter() - start}
+
+    transactions = cat_df[["date", "description", "amount", "category"]].copy()
+    transactions.insert(0, "file", path)
+    return {
+        "path": path,
+        "status": "ok",
+        "rows": len(cat_df),
+        "seconds": time.perf_counter() - start,
+        "result": result,
+        "transactions": transactions,
+    }
+
+
+class _TransactionWriter:
+    """Grava as transações categorizadas em Parquet ou JSONL.
+
+    Parquet: um arquivo por extrato, escrito em arquivo temporário e renomeado só depois de
+    fechado, para que toda entrada "ok" do manifesto aponte para um arquivo legível.
+    JSONL: um arquivo por execução, com flush a cada extrato.
+    """
+
+    SCHEMA_COLUMNS = ("file", "date", "description", "amount", "category")
+
+    def __init__(self, output_dir: str, fmt: str):
+        self.fmt = fmt
+        self._fh = None
+        if fmt == "parquet":
+            if pa is None:
+                raise ImportError("pyarrow não está instalado (necessário para saída Parquet)")
+            self._schema = pa.schema([
+                ("file", pa.string()),
+                ("date", pa.timestamp("ns")),
+                ("description", pa.string()),
+                ("amount", pa.float64()),
+                ("category", pa.string()),
+            ])
+            self.path = os.path.join(output_dir, "transactions")
+            os.makedirs(self.path, exist_ok=True)
+        else:
+            run_id = time.strftime("%Y%m%d-%H%M%S")
+            self.path = os.path.join(output_dir, f"transactions-{run_id}.{fmt}")
+            self._fh = open(self.path, "a", encoding="utf-8")
+
+    def write(self, df: pd.DataFrame, key: str) -> str:
+        """Grava as transações de um extrato e retorna o arquivo que as contém."""
+        df = df.astype({"file": str, "description": str, "amount": float, "category": str})
+        df["date"] = pd.to_datetime(df["date"], errors="coerce")
+        if self.fmt == "parquet":
+            name = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+            path = os.path.join(self.path, f"{name}.parquet")
+            tmp = f"{path}.tmp"
+            table = pa.Table.from_pandas(df[list(self.SCHEMA_COLUMNS)], schema=self._schema, preserve_index=False)
+            pq.write_table(table, tmp)
+            os.replace(tmp, path)
+            return path
+        self._fh.write(df.to_json(orient="records", lines=True, date_format="iso"))
+        self._fh.flush()
+        return self.path
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+
+
+def run_batch(paths: list, output_dir: str, workers: int = None, fmt: str = "parquet", use_llm: bool = False) -> dict:
+    """Processa os extratos ainda não presentes no manifesto e retorna contadores da execução."""
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    done = load_manifest(manifest_path)
+
+    files = find_statement_files(paths)
+    pending = [(path, key) for path, key in ((p, _file_key(p)) for p in files) if key not in done]
+    skipped = len(files) - len(pending)
+    print(f"{len(pending)} arquivo(s) a processar, {skipped} já processado(s)")
+
+    stats = {"ok": 0, "empty": 0, "error": 0, "skipped": skipped, "rows": 0}
+    if not pending:
+        return stats
+
+    writer = _TransactionWriter(output_dir, fmt)
+    started = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool, \
+                open(manifest_path, "a", encoding="utf-8") as manifest, \
+                open(os.path.join(output_dir, SUMMARIES_NAME), "a", encoding="utf-8") as summaries:
+            futures = {pool.submit(process_file, path, use_llm): key for path, key in pending}
+            for future in as_completed(futures):
+                res = future.result()
+                status = res["status"]
+                stats[status] += 1
+                stats["rows"] += res["rows"]
+
+                key = futures[future]
+                entry = {"key": key, "path": res["path"], "status": status, "rows": res["rows"]}
+                if status == "ok":
+                    entry["output"] = writer.write(res["transactions"], key)
+                    summaries.write(json.dumps({"file": res["path"], **res["result"]}, ensure_ascii=False) + "\n")
+                    summaries.flush()
+
+                # Registrar no manifesto só depois de gravar (e fechar) as saídas do arquivo
+                if "error" in res:
+                    entry["error"] = res["error"]
+                manifest.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                manifest.flush()
+
+                rate = res["rows"] / res["seconds"] if res["seconds"] > 0 else 0.0
+                detail = f" ({res['error']})" if "error" in res else ""
+                print(f"[{status}] {res['path']}: {res['rows']} transações em {res['seconds']:.2f}s ({rate:.0f} tx/s){detail}")
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"Concluído: {len(pending)} arquivo(s), {stats['rows']} transações em {elapsed:.2f}s "
+        f"({len(pending) / elapsed:.1f} arquivos/s, {stats['rows'] / elapsed:.0f} tx/s). Saída: {writer.path}"
+    )
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Processamento em lote de extratos (CSV, PDF, OFX, QIF).")
+    parser.add_argument("paths", nargs="+", help="arquivos ou diretórios de extratos")
+    parser.add_argument("--output-dir", default="batch_output", help="diretório de saída (padrão: batch_output)")
+    parser.add_argument("--workers", type=int, default=None, help="número de processos (padrão: nº de CPUs)")
+    parser.add_argument("--format", choices=("parquet", "jsonl"), default="parquet", help="formato das transações")
+    parser.add_argument("--llm", action="store_true", help="gerar sugestão via LLM para cada arquivo (lento)")
+    args = parser.parse_args(argv)
+
+    stats = run_batch(args.paths, args.output_dir, workers=args.workers, fmt=args.format, use_llm=args.llm)
+    return 1 if stats["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+from .insights import detect_recurring_subscriptions
+from .predict import arima_forecast
+
+# Frequências suportadas: diária e semanal
+FREQUENCIES = ("D", "W")
+# Número de processos para ajustar os modelos por categoria em paralelo
+CASHFLOW_WORKERS = int(os.getenv("CASHFLOW_WORKERS", str(os.cpu_count() or 1)))
+# Abaixo desse número de períodos o ARIMA não é ajustado e usa-se a média histórica
+MIN_POINTS = 8
+
+# Pool compartilhado entre requisições, criado sob demanda. Usa "spawn" para não fazer
+# fork de um processo com threads (servidor Flask).
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def resample_flows(df: pd.DataFrame, freq: str = "W") -> pd.DataFrame:
+    """Fluxo líquido (soma de amount) por período (linhas) e categoria (colunas)."""
+    dated = df.dropna(subset=["date"])
+    if dated.empty:
+        return pd.DataFrame()
+    flows = dated.pivot_table(index="date", columns="category", values="amount", aggfunc="sum")
+    return flows.resample(freq).sum().fillna(0.0)
+
+
+def _can_fit(series: pd.Series) -> bool:
+    return len(series) >= MIN_POINTS and series.std() > 0
+
+
+def _mean_forecast(series: pd.Series, steps: int) -> np.ndarray:
+    return np.full(steps, series.mean() if len(series) else 0.0)
+
+
+def _forecast_series(values: np.ndarray, steps: int, order) -> np.ndarray:
+    """Ajusta ARIMA em uma série; usa a média histórica com poucos pontos ou se o ajuste falhar."""
+    series = pd.Series(values, dtype=float)
+    if _can_fit(series):
+        try:
+            forecast, _ = arima_forecast(series, steps=steps, order=order)
+            return np.asarray(forecast, dtype=float)
+        except Exception as e:
+            print(f"Erro no ajuste ARIMA do fluxo de caixa: {e}")
+    return _mean_forecast(series, steps)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=CASHFLOW_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def _discard_executor(pool: ProcessPoolExecutor):
+    """Descarta um pool quebrado (worker morreu) para que a próxima requisição crie outro."""
+    global _executor
+    with _executor_lock:
+        if _executor is pool:
+            _executor = None
+    pool.shutdown(wait=False)
+
+
+def _forecast_all(flows: pd.DataFrame, steps: int, order) -> pd.DataFrame:
+    """Prevê todas as categorias de uma vez.
+
+    Só as séries que de fato ajustam ARIMA vão para o pool de processos; as demais usam
+    a média histórica diretamente.
+    """
+    results = {}
+    to_fit = []
+    for column in flows.columns:
+        series = flows[column].astype(float)
+        if _can_fit(series):
+            to_fit.append(column)
+        else:
+            results[column] = _mean_forecast(series, steps)
+
+    futures = {}
+    if CASHFLOW_WORKERS > 1 and len(to_fit) > 1:
+        pool = _get_executor()
+        try:
+            for column in to_fit:
+                futures[column] = pool.submit(_forecast_series, flows[column].to_numpy(), steps, order)
+        except BrokenProcessPool:
+            _discard_executor(pool)
+
+    for column in to_fit:
+        future = futures.get(column)
+        if future is not None:
+            try:
+                results[column] = future.result()
+                continue
+            except BrokenProcessPool:
+                _discard_executor(pool)
+        # Sem pool (ou pool quebrado): ajustar no próprio processo
+        results[column] = _forecast_series(flows[column].to_numpy(), steps, order)
+
+    return pd.DataFrame({c: results[c] for c in flows.columns})
+
+
+def recurring_schedule(df: pd.DataFrame, until: pd.Timestamp, min_occurrences: int = 3) -> pd.DataFrame:
+    """Projeta as cobranças recorrentes (mesma descrição repetida) até a data `until`.
+
+    O intervalo é a mediana de dias entre ocorrências e o valor a mediana dos lançamentos.
+    Retorna DataFrame com colunas date, description, category, amount.
+    """
+    recurring = set(detect_recurring_subscriptions(df, min_occurrences))
+    dated = df.dropna(subset=["date"])
+    rows = []
+    for desc, group in dated[dated["description"].isin(recurring)].groupby("description"):
+        dates = group["date"].sort_values()
+        interval = dates.diff().dt.days.median()
+        if pd.isna(interval) or interval <= 0:
+            continue
+        step = pd.Timedelta(days=interval)
+        amount = float(group["amount"].median())
+        category = group["category"].mode().iloc[0]
+        next_date = dates.iloc[-1] + step
+        while next_date <= until:
+            rows.append({"date": next_date, "description": desc, "category": category, "amount": amount})
+            next_date += step
+    return pd.DataFrame(rows, columns=["date", "description", "category", "amount"])
+
+
+def forecast_cashflow(
+    df: pd.DataFrame,
+    freq: str = "W",
+    steps: int = 4,
+    order=(1, 0, 0),
+    starting_balance: float = 0.0,
+) -> dict:
+    """Projeta o fluxo de caixa dos próximos `steps` períodos a partir de um extrato categorizado.
+
+    As cobranças recorrentes são removidas do histórico antes do ajuste por categoria e
+    sobrepostas na projeção nas datas previstas, para não serem contadas duas vezes.
+    """
+    if freq not in FREQUENCIES:
+        raise ValueError(f"Frequência inválida: {freq}")
+    if steps < 1:
+        raise ValueError(f"steps deve ser >= 1: {steps}")
+
+    dated = df.dropna(subset=["date"])
+    if dated.empty:
+        return {}
+
+    history_index = dated.set_index("date")["amount"].resample(freq).sum().index
+    future_index = pd.date_range(history_index[-1], periods=steps + 1, freq=history_index.freq)[1:]
+
+    # Cobranças recorrentes com cadência conhecida
+    schedule = recurring_schedule(dated, until=future_index[-1])
+    schedule = schedule[schedule["date"] > history_index[-1]].copy()
+    base = dated[~dated["description"].isin(schedule["description"].unique())]
+
+    flows = resample_flows(base, freq).reindex(history_index, fill_value=0.0)
+    by_category = _forecast_all(flows, steps, order).set_axis(future_index) if not flows.empty else pd.DataFrame(index=future_index)
+
+    if not schedule.empty:
+        # Associar cada data ao primeiro período futuro cujo rótulo não é anterior a ela
+        schedule["period"] = future_index[future_index.searchsorted(schedule["date"])]
+        overlay = schedule.pivot_table(index="period", columns="category", values="amount", aggfunc="sum")
+        by_category = by_category.add(overlay.reindex(future_index), fill_value=0.0).fillna(0.0)
+
+    net = by_category.sum(axis=1)
+    balance = starting_balance + net.cumsum()
+
+    return {
+        "freq": freq,
+        "periods": [ts.date().isoformat() for ts in future_index],
+        "by_category": {str(c): by_category[c].round(2).tolist() for c in by_category.columns},
+        "recurring": [
+            {"date": r.date.date().isoformat(), "description": r.description, "category": r.category, "amount": round(r.amount, 2)}
+            for r in schedule.itertuples()
+        ],
+        "net": net.round(2).tolist(),
+        "balance": balance.round(2).tolist(),
+    }
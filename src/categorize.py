@@ -1,3 +1,5 @@
+import hashlib
+import json
 import re
 import pandas as pd
 
@@ -12,23 +14,46 @@ CATEGORY_KEYWORDS = {
     "servicos": ["telefone", "internet", "movimento", "cartao"],
 }
 
+# Versão do conjunto de regras: muda automaticamente sempre que CATEGORY_KEYWORDS for alterado
+RULESET_VERSION = hashlib.sha256(
+    json.dumps(CATEGORY_KEYWORDS, sort_keys=True, ensure_ascii=False).encode("utf-8")
+).hexdigest()[:12]
 
-def categorize_transactions(df: pd.DataFrame) -> pd.DataFrame:
+
+def rule_categories(descriptions: pd.Series) -> pd.Series:
+    """Aplica as regras de keywords de forma vetorizada (uma passada por categoria).
+
+    A primeira categoria de CATEGORY_KEYWORDS com alguma keyword contida na descrição vence.
+    """
+    lowered = descriptions.fillna("").astype(str).str.lower()
+    result = pd.Series("outros", index=descriptions.index, dtype=object)
+    pending = pd.Series(True, index=descriptions.index)
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        pattern = "|".join(re.escape(kw) for kw in keywords)
+        hit = pending & lowered.str.contains(pattern, regex=True)
+        result[hit] = category
+        pending &= ~hit
+    return result
+
+
+def categorize_transactions(df: pd.DataFrame, use_model: bool = True) -> pd.DataFrame:
     """Aplica regras de correspondência de keywords para atribuir categorias.
 
+    Linhas que nenhuma regra reconhece ("outros") são enviadas ao classificador local
+    (`src/classifier.py`), quando houver um modelo treinado para a versão atual das regras.
     Retorna uma cópia do DataFrame com coluna `category`.
     """
-    def categorize_description(desc: str) -> str:
-        d = desc.lower()
-        for category, keywords in CATEGORY_KEYWORDS.items():
-            for kw in keywords:
-                # padrão simples
-                if kw in d:
-                    return category
-        return "outros"
-
     out = df.copy()
-    out["category"] = out["description"].fillna("").apply(categorize_description)
+    out["category"] = rule_categories(out["description"])
+
+    if use_model:
+        missing = out["category"] == "outros"
+        if missing.any():
+            from .classifier import load_classifier, predict_categories
+
+            model = load_classifier()
+            if model is not None:
+                out.loc[missing, "category"] = predict_categories(model, out.loc[missing, "description"])
     return out
 
 
@@ -0,0 +1,105 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+try:
+    import joblib
+    from sklearn.feature_extraction.text import HashingVectorizer
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.pipeline import make_pipeline
+except Exception:
+    joblib = None
+    HashingVectorizer = None
+
+from .categorize import RULESET_VERSION
+
+# Diretório onde o modelo treinado é salvo (um arquivo por versão das regras)
+MODEL_DIR = os.getenv("CATEGORIZER_MODEL_DIR", os.path.join(os.path.dirname(__file__), "..", "models"))
+# Probabilidade mínima para aceitar a categoria prevista; abaixo disso mantém "outros"
+MIN_CONFIDENCE = float(os.getenv("CATEGORIZER_MIN_CONFIDENCE", "0.5"))
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+def model_path() -> str:
+    return os.path.join(MODEL_DIR, f"categorizer-{RULESET_VERSION}.joblib")
+
+
+def classifier_version() -> str:
+    """Identifica o modelo salvo atual (vazio se não houver), para invalidar caches derivados."""
+    try:
+        return str(os.stat(model_path()).st_mtime_ns)
+    except OSError:
+        return ""
+
+
+def _build_model():
+    # Features: n-gramas de caracteres (2 a 4) com hashing, sem vocabulário a manter
+    vectorizer = HashingVectorizer(
+        analyzer="char_wb",
+        ngram_range=(2, 4),
+        n_features=2 ** 18,
+        alternate_sign=False,
+        lowercase=True,
+    )
+    return make_pipeline(vectorizer, SGDClassifier(loss="log_loss", alpha=1e-5, max_iter=50, random_state=0))
+
+
+def train_classifier(ledger: pd.DataFrame, save: bool = True):
+    """Treina o classificador a partir de um histórico já categorizado (colunas description, category).
+
+    Linhas "outros" são ignoradas. Retorna None se não houver ao menos duas categorias.
+    """
+    if HashingVectorizer is None:
+        raise ImportError("scikit-learn não está instalado")
+
+    labeled = ledger[ledger["category"].notna() & (ledger["category"] != "outros")]
+    if labeled["category"].nunique() < 2:
+        return None
+
+    model = _build_model()
+    model.fit(labeled["description"].fillna("").astype(str), labeled["category"].astype(str))
+
+    if save:
+        os.makedirs(MODEL_DIR, exist_ok=True)
+        path = model_path()
+        tmp = f"{path}.tmp"
+        joblib.dump(model, tmp)
+        os.replace(tmp, path)
+        with _lock:
+            _loaded[path] = (classifier_version(), model)
+    return model
+
+
+def load_classifier():
+    """Carrega o modelo salvo para a versão atual das regras (memoizado em processo)."""
+    if joblib is None:
+        return None
+    path = model_path()
+    version = classifier_version()
+    if not version:
+        return None
+    with _lock:
+        cached = _loaded.get(path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        try:
+            model = joblib.load(path)
+        except Exception as e:
+            print(f"Erro ao carregar classificador: {e}")
+            return None
+        _loaded[path] = (version, model)
+        return model
+
+
+def predict_categories(model, descriptions: pd.Series, min_confidence: float = MIN_CONFIDENCE) -> np.ndarray:
+    """Prevê categorias de todas as descrições de uma vez; baixa confiança resulta em "outros"."""
+    if len(descriptions) == 0:
+        return np.array([], dtype=object)
+    proba = model.predict_proba(descriptions.fillna("").astype(str))
+    classes = model.classes_
+    best = proba.argmax(axis=1)
+    return np.where(proba[np.arange(len(best)), best] >= min_confidence, classes[best], "outros").astype(object)
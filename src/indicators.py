@@ -0,0 +1,303 @@
+import inspect
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Campos de preço usados pelos indicadores (colunas de `get_stock_data`)
+PRICE_FIELDS = ("high", "low", "close")
+# Máximo de entradas (símbolo, indicador, parâmetros) mantidas em memória
+INDICATOR_CACHE_SIZE = int(os.getenv("INDICATOR_CACHE_SIZE", "256"))
+
+
+def _seeded_ewm(values, alpha: float, seed=None):
+    """Média exponencial (adjust=False) que continua a partir do último valor calculado.
+
+    `values` pode ser uma Series (um símbolo) ou um DataFrame largo (colunas = símbolos);
+    `seed` é o último valor da média (escalar ou Series indexada pelos símbolos).
+    """
+    if seed is None:
+        return values.ewm(alpha=alpha, adjust=False).mean()
+    if isinstance(values, pd.DataFrame):
+        head = pd.DataFrame([seed], columns=values.columns)
+    else:
+        head = pd.Series([seed], dtype=float)
+    out = pd.concat([head, values]).ewm(alpha=alpha, adjust=False).mean()
+    return out.iloc[1:].set_axis(values.index)
+
+
+def _extend(values, state, key: str, keep: int):
+    """Concatena a cauda guardada no estado com os novos valores.
+
+    Retorna (série estendida, nova cauda com as últimas `keep` linhas).
+    """
+    prev = None if state is None else state.get(key)
+    full = values if prev is None else pd.concat([prev, values])
+    return full, full.iloc[-keep:]
+
+
+def _last(obj):
+    """Último valor (escalar para Series, Series por símbolo para DataFrame)."""
+    return obj.iloc[-1]
+
+
+# Cada função `_<indicador>_step` recebe os campos de preço, o estado anterior (ou None)
+# e os parâmetros; retorna (dict saída -> valores apenas para as novas barras, novo estado).
+
+
+def _sma_step(fields, state, window: int = 20):
+    close = fields["close"]
+    full, tail = _extend(close, state, "tail", window)
+    sma = full.rolling(window).mean().iloc[-len(close):]
+    return {"sma": sma}, {"tail": tail}
+
+
+def _ema_step(fields, state, span: int = 20):
+    seed = None if state is None else state["ema"]
+    ema = _seeded_ewm(fields["close"], 2.0 / (span + 1), seed)
+    return {"ema": ema}, {"ema": _last(ema)}
+
+
+def _rsi_step(fields, state, period: int = 14):
+    close = fields["close"]
+    full, prev_close = _extend(close, state, "prev_close", 1)
+    delta = full.diff().iloc[-len(close):]
+    gain = delta.clip(lower=0)
+    loss = -delta.clip(upper=0)
+
+    avg_gain = _seeded_ewm(gain, 1.0 / period, None if state is None else state["avg_gain"])
+    avg_loss = _seeded_ewm(loss, 1.0 / period, None if state is None else state["avg_loss"])
+    rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    new_state = {"prev_close": prev_close, "avg_gain": _last(avg_gain), "avg_loss": _last(avg_loss)}
+    return {"rsi": rsi}, new_state
+
+
+def _macd_step(fields, state, fast: int = 12, slow: int = 26, signal: int = 9):
+    close = fields["close"]
+    state = state or {}
+    ema_fast = _seeded_ewm(close, 2.0 / (fast + 1), state.get("fast"))
+    ema_slow = _seeded_ewm(close, 2.0 / (slow + 1), state.get("slow"))
+    macd = ema_fast - ema_slow
+    signal_line = _seeded_ewm(macd, 2.0 / (signal + 1), state.get("signal"))
+    new_state = {"fast": _last(ema_fast), "slow": _last(ema_slow), "signal": _last(signal_line)}
+    return {"macd": macd, "signal": signal_line, "histogram": macd - signal_line}, new_state
+
+
+def _bollinger_step(fields, state, window: int = 20, num_std: float = 2.0):
+    close = fields["close"]
+    full, tail = _extend(close, state, "tail", window)
+    rolling = full.rolling(window)
+    middle = rolling.mean().iloc[-len(close):]
+    std = rolling.std(ddof=0).iloc[-len(close):]
+    out = {"middle": middle, "upper": middle + num_std * std, "lower": middle - num_std * std}
+    return out, {"tail": tail}
+
+
+def _atr_step(fields, state, period: int = 14):
+    high, low, close = fields["high"], fields["low"], fields["close"]
+    full, prev_close = _extend(close, state, "prev_close", 1)
+    prev = full.shift(1).iloc[-len(close):]
+    # True range: maior entre (máx - mín), |máx - fech. anterior| e |mín - fech. anterior|
+    tr = np.fmax(np.fmax(high - low, (high - prev).abs()), (low - prev).abs())
+    atr = _seeded_ewm(tr, 1.0 / period, None if state is None else state["atr"])
+    return {"atr": atr}, {"prev_close": prev_close, "atr": _last(atr)}
+
+
+def _volatility_step(fields, state, window: int = 20, periods_per_year: int = 252):
+    close = fields["close"]
+    full, tail = _extend(close, state, "tail", window + 1)
+    log_ret = np.log(full / full.shift(1))
+    vol = log_ret.rolling(window).std() * np.sqrt(periods_per_year)
+    return {"volatility": vol.iloc[-len(close):]}, {"tail": tail}
+
+
+INDICATORS = {
+    "sma": _sma_step,
+    "ema": _ema_step,
+    "rsi": _rsi_step,
+    "macd": _macd_step,
+    "bollinger": _bollinger_step,
+    "atr": _atr_step,
+    "volatility": _volatility_step,
+}
+
+
+def _combine(out: dict):
+    if len(out) == 1:
+        return next(iter(out.values()))
+    return pd.concat(out, axis=1)
+
+
+def sma(close, window: int = 20):
+    """Média móvel simples. `close` pode ser Series ou DataFrame largo (colunas = símbolos)."""
+    return _combine(_sma_step({"close": close}, None, window=window)[0])
+
+
+def ema(close, span: int = 20):
+    """Média móvel exponencial."""
+    return _combine(_ema_step({"close": close}, None, span=span)[0])
+
+
+def rsi(close, period: int = 14):
+    """Índice de força relativa (suavização de Wilder)."""
+    return _combine(_rsi_step({"close": close}, None, period=period)[0])
+
+
+def macd(close, fast: int = 12, slow: int = 26, signal: int = 9):
+    """MACD, linha de sinal e histograma."""
+    return _combine(_macd_step({"close": close}, None, fast=fast, slow=slow, signal=signal)[0])
+
+
+def bollinger_bands(close, window: int = 20, num_std: float = 2.0):
+    """Bandas de Bollinger (middle, upper, lower)."""
+    return _combine(_bollinger_step({"close": close}, None, window=window, num_std=num_std)[0])
+
+
+def atr(high, low, close, period: int = 14):
+    """Average True Range."""
+    return _combine(_atr_step({"high": high, "low": low, "close": close}, None, period=period)[0])
+
+
+def realized_volatility(close, window: int = 20, periods_per_year: int = 252):
+    """Volatilidade realizada anualizada (desvio padrão móvel dos log-retornos)."""
+    return _combine(_volatility_step({"close": close}, None, window=window, periods_per_year=periods_per_year)[0])
+
+
+def _group_by_index(frames: dict, symbols: list) -> list:
+    """Agrupa símbolos com índice idêntico para calculá-los juntos em um único DataFrame largo."""
+    groups = []
+    for symbol in symbols:
+        for group in groups:
+            if frames[group[0]].index.equals(frames[symbol].index):
+                group.append(symbol)
+                break
+        else:
+            groups.append([symbol])
+    return groups
+
+
+def _step_provisional(step, fields: dict, state, params: dict):
+    """Processa as barras tratando a última como provisória (ainda em formação).
+
+    Retorna (saídas de todas as barras, estado após a penúltima barra), para que a última
+    barra seja reprocessada na próxima chamada caso tenha sido revisada.
+    """
+    confirmed = {f: v.iloc[:-1] for f, v in fields.items()}
+    last = {f: v.iloc[-1:] for f, v in fields.items()}
+    out_confirmed = None
+    if len(confirmed["close"]):
+        out_confirmed, state = step(confirmed, state, **params)
+    out_last, _ = step(last, state, **params)
+    if out_confirmed is None:
+        return out_last, state
+    return {k: pd.concat([out_confirmed[k], out_last[k]]) for k in out_last}, state
+
+
+class IndicatorCache:
+    """Memoiza indicadores por (símbolo, indicador, parâmetros).
+
+    Quando o DataFrame de preços recebido estende o último cálculo, apenas as barras após a
+    última barra confirmada são processadas a partir do estado guardado (caudas das janelas
+    móveis e últimos valores das médias exponenciais). A barra mais recente é sempre tratada
+    como provisória e reprocessada, pois o candle intraday atual ainda pode mudar. Se a
+    barra confirmada mudou ou há preços faltantes (NaN), a série é recalculada por inteiro.
+    As entradas menos usadas são descartadas acima de `max_entries` (LRU).
+    """
+
+    def __init__(self, max_entries: int = INDICATOR_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @staticmethod
+    def _can_extend(entry: dict, df: pd.DataFrame) -> bool:
+        confirmed = entry["confirmed"]
+        if confirmed not in df.index or not (df.index > confirmed).any():
+            return False
+        # NaN muda a ponderação das médias exponenciais; nesses casos recalcular tudo
+        if df[list(PRICE_FIELDS)].isna().any().any():
+            return False
+        return bool((df.loc[confirmed, list(PRICE_FIELDS)] == entry["confirmed_prices"]).all())
+
+    def _store(self, key, result: pd.DataFrame, state, df: pd.DataFrame):
+        self._entries[key] = {
+            "result": result,
+            "state": state,
+            "confirmed": df.index[-2],
+            "confirmed_prices": df[list(PRICE_FIELDS)].iloc[-2],
+        }
+        self._entries.move_to_end(key)
+
+    def compute(self, symbol: str, df: pd.DataFrame, name: str, **params) -> pd.DataFrame:
+        """Retorna DataFrame (colunas = saídas do indicador) alinhado ao índice de `df`."""
+        return self.compute_many({symbol: df}, name, **params)[symbol]
+
+    def compute_many(self, frames: dict, name: str, **params) -> dict:
+        """Calcula um indicador para vários símbolos ({símbolo: DataFrame de preços}).
+
+        Símbolos sem cache e com o mesmo índice são calculados de forma vetorizada juntos.
+        """
+        if name not in INDICATORS:
+            raise ValueError(f"Indicador desconhecido: {name}")
+        step = INDICATORS[name]
+        # Completar com os valores padrão, para que sma() e sma(window=20) compartilhem a entrada
+        bound = inspect.signature(step).bind_partial(None, None, **params)
+        bound.apply_defaults()
+        params = {k: v for k, v in bound.arguments.items() if k not in ("fields", "state")}
+        params_key = tuple(sorted(params.items()))
+
+        results = {}
+        pending = []
+        with self._lock:
+            for symbol, df in frames.items():
+                if df.empty:
+                    results[symbol] = pd.DataFrame()
+                    continue
+                key = (symbol, name, params_key)
+                entry = self._entries.get(key)
+                if entry is None or not self._can_extend(entry, df):
+                    pending.append(symbol)
+                    continue
+
+                new = df[df.index > entry["confirmed"]]
+                out, state = _step_provisional(step, {f: new[f] for f in PRICE_FIELDS}, entry["state"], params)
+                kept = entry["result"][entry["result"].index <= entry["confirmed"]]
+                # Descartar barras que não fazem mais parte da janela buscada
+                result = pd.concat([kept, pd.DataFrame(out)])
+                result = result[result.index >= df.index[0]]
+                if len(new) > 1:
+                    self._store(key, result, state, df)
+                else:
+                    entry["result"] = result
+                    self._entries.move_to_end(key)
+                results[symbol] = result
+
+            for group in _group_by_index(frames, pending):
+                fields = {f: pd.DataFrame({s: frames[s][f] for s in group}) for f in PRICE_FIELDS}
+                if len(frames[group[0]]) < 2:
+                    # Uma única barra (provisória): nada a memoizar
+                    out, _ = step(fields, None, **params)
+                    for s in group:
+                        results[s] = pd.DataFrame({k: v[s] for k, v in out.items()})
+                    continue
+
+                out, state = _step_provisional(step, fields, None, params)
+                for s in group:
+                    result = pd.DataFrame({k: v[s] for k, v in out.items()})
+                    self._store((s, name, params_key), result, {k: v[s] for k, v in state.items()}, frames[s])
+                    results[s] = result
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return results
+
+
+# Cache compartilhado pelos endpoints da aplicação
+indicator_cache = IndicatorCache()
@@ -1,18 +1,56 @@
 import os
+import threading
+import time
+from collections import OrderedDict
+
 import requests
 import pandas as pd
 
 ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY")
+# Tempo (segundos) em que uma série buscada é reaproveitada sem nova chamada à API
+PRICE_CACHE_TTL = int(os.getenv("PRICE_CACHE_TTL", "60"))
+# Máximo de séries (símbolo, intervalo, tamanho) mantidas em memória (LRU)
+PRICE_CACHE_SIZE = int(os.getenv("PRICE_CACHE_SIZE", "128"))
+
+_price_cache = OrderedDict()
+_price_cache_lock = threading.Lock()
+
+
+def _cached_prices(key):
+    """Série em cache ainda válida para a chave, removendo-a se expirou."""
+    with _price_cache_lock:
+        cached = _price_cache.get(key)
+        if cached is None:
+            return None
+        if time.monotonic() - cached[0] >= PRICE_CACHE_TTL:
+            del _price_cache[key]
+            return None
+        _price_cache.move_to_end(key)
+        return cached[1]
+
+
+def _store_prices(key, df: pd.DataFrame):
+    with _price_cache_lock:
+        _price_cache[key] = (time.monotonic(), df)
+        _price_cache.move_to_end(key)
+        while len(_price_cache) > PRICE_CACHE_SIZE:
+            _price_cache.popitem(last=False)
 
 
 def get_stock_data(symbol: str = "IBM", interval: str = "60min", outputsize: str = "compact") -> pd.DataFrame:
     """Busca dados intraday de uma ação via Alpha Vantage e retorna DataFrame.
 
     Retorna colunas: open, high, low, close, volume com índice datetime.
+    Resultados são mantidos em memória por `PRICE_CACHE_TTL` segundos.
     """
     if not ALPHA_VANTAGE_API_KEY:
         raise EnvironmentError("ALPHA_VANTAGE_API_KEY não definida")
 
+    cache_key = (symbol, interval, outputsize)
+    cached = _cached_prices(cache_key)
+    if cached is not None:
+        return cached.copy()
+
     url = (
         f"https://www.alphavantage.co/query?function=TIME_SERIES_INTRADAY&symbol={symbol}"
         f"&interval={interval}&outputsize={outputsize}&apikey={ALPHA_VANTAGE_API_KEY}"
@@ -30,4 +68,5 @@ def get_stock_data(symbol: str = "IBM", interval: str = "60min", outputsize: str
     df.index = pd.to_datetime(df.index)
     df.columns = ["open", "high", "low", "close", "volume"]
     df = df.sort_index()
-    return df
+    _store_prices(cache_key, df)
+    return df.copy()
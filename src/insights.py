@@ -40,8 +40,11 @@ def rule_based_savings(df: pd.DataFrame) -> list:
     return suggestions
 
 
-def generate_statement_insights(df: pd.DataFrame) -> dict:
-    """Retorna um dicionário com resumo, categorias e sugestões. Usa LLM para complemento quando disponível."""
+def generate_statement_insights(df: pd.DataFrame, use_llm: bool = True) -> dict:
+    """Retorna um dicionário com resumo, categorias e sugestões. Usa LLM para complemento quando disponível.
+
+    Com `use_llm=False` a chamada ao LLM é omitida (ex.: processamento em lote).
+    """
     summary = summary_by_category(df).to_dict(orient="records")
     rules = rule_based_savings(df)
 
@@ -53,10 +56,12 @@ def generate_statement_insights(df: pd.DataFrame) -> dict:
     for s in rules:
         text_input += f"- {s}\n"
 
-    try:
-        llm_text = generate_financial_summary(text_input)
-    except Exception:
-        llm_text = ""  # fallback
+    llm_text = ""
+    if use_llm:
+        try:
+            llm_text = generate_financial_summary(text_input)
+        except Exception:
+            llm_text = ""  # fallback
 
     return {
         "category_summary": summary,
@@ -3,12 +3,36 @@ import openai
 
 # Compatibilidade: biblioteca openai pode requerer OPENAI_API_KEY ou variável mais nova
 openai.api_key = os.getenv("OPENAI_API_KEY")
+# Permite apontar para um backend compatível (ex.: servidor local falso em testes)
+if os.getenv("OPENAI_API_BASE"):
+    openai.api_base = os.getenv("OPENAI_API_BASE")
 
 
-def generate_financial_summary(text_input: str, model: str = "gpt-3.5-turbo") -> str:
+def _stream_completion(model: str, messages: list):
+    """Gera os fragmentos de texto da resposta conforme o modelo os produz (stream=True).
+
+    Erros da chamada são propagados para quem consome o gerador (ex.: evento `error` do SSE).
+    """
+    resp = openai.ChatCompletion.create(
+        model=model,
+        messages=messages,
+        max_tokens=500,
+        temperature=0.6,
+        stream=True,
+    )
+    for chunk in resp:
+        choice = chunk["choices"][0]
+        delta = choice.get("delta") or {}
+        text = delta.get("content") or choice.get("text")
+        if text:
+            yield text
+
+
+def generate_financial_summary(text_input: str, model: str = "gpt-3.5-turbo", stream: bool = False):
     """Gera um resumo simples a partir de um texto financeiro usando OpenAI ChatCompletion.
 
     Retorna string vazia se chave não estiver definida para facilitar fallback em regras.
+    Com `stream=True` retorna um gerador de fragmentos de texto em vez da string completa.
     """
     if not openai.api_key:
         raise EnvironmentError("OPENAI_API_KEY não definida")
@@ -18,15 +42,19 @@ def generate_financial_summary(text_input: str, model: str = "gpt-3.5-turbo") ->
         "(positivo/negativo/neutro) e proponha 2-3 ações práticas para reduzir gastos ou aumentar poupança.\n\n"
         + text_input
     )
+    messages = [
+        {"role": "system", "content": "Você é um analista financeiro experiente e imparcial."},
+        {"role": "user", "content": prompt},
+    ]
+
+    if stream:
+        return _stream_completion(model, messages)
 
     try:
         # Utilizando ChatCompletion compatível com openai>=0.27.x; adaptável conforme SDK
         resp = openai.ChatCompletion.create(
             model=model,
-            messages=[
-                {"role": "system", "content": "Você é um analista financeiro experiente e imparcial."},
-                {"role": "user", "content": prompt},
-            ],
+            messages=messages,
             max_tokens=500,
             temperature=0.6,
         )
@@ -0,0 +1,50 @@
+import pandas as pd
+
+from .bank_ingest import parse_statement_csv
+from .categorize import categorize_transactions
+from .insights import generate_statement_insights
+
+# Extensões de extrato reconhecidas (demais arquivos são tratados como CSV no upload)
+STATEMENT_EXTENSIONS = (".csv", ".pdf", ".ofx", ".qfx", ".qif")
+
+
+def parse_statement_file(file_stream, filename: str) -> pd.DataFrame:
+    """Parseia um extrato conforme a extensão do nome do arquivo (CSV por padrão)."""
+    filename = (filename or "").lower()
+    if filename.endswith(".pdf"):
+        from .pdf_ingest import parse_statement_pdf
+
+        return parse_statement_pdf(file_stream)
+    elif filename.endswith(".ofx") or filename.endswith(".qfx"):
+        # OFX/QFX
+        from .ofx_ingest import parse_statement_ofx
+
+        return parse_statement_ofx(file_stream)
+    elif filename.endswith(".qif"):
+        from .qif_ingest import parse_statement_qif
+
+        return parse_statement_qif(file_stream)
+    # tratar como CSV por padrão
+    return parse_statement_csv(file_stream)
+
+
+def analyze_statement(df: pd.DataFrame, use_llm: bool = True):
+    """Executa categorização e insights sobre um extrato normalizado.
+
+    Retorna (DataFrame categorizado, dicionário de resultado exposto por /statement).
+    """
+    cat_df = categorize_transactions(df)
+    insights = generate_statement_insights(cat_df, use_llm=use_llm)
+
+    # Breve resumo: total gasto e top categorias
+    total_spent = float(cat_df[cat_df["amount"] < 0]["amount"].abs().sum())
+    income = float(cat_df[cat_df["amount"] > 0]["amount"].sum())
+
+    result = {
+        "total_spent": round(total_spent, 2),
+        "income": round(income, 2),
+        "category_summary": insights["category_summary"],
+        "rule_suggestions": insights["rule_suggestions"],
+        "llm_suggestion": insights.get("llm_suggestion", ""),
+    }
+    return cat_df, result
@@ -0,0 +1,44 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "128"))
+
+
+def fingerprint(*parts) -> str:
+    """Hash estável (sha256) de uma sequência de partes str/bytes, usado como chave e ETag."""
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        h.update(part)
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class ResponseCache:
+    """Cache LRU em memória de respostas já renderizadas (corpo em bytes + mimetype)."""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, body: bytes, mimetype: str):
+        with self._lock:
+            self._entries[key] = (body, mimetype)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
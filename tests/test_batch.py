@@ -0,0 +1,34 @@
+import json
+import os
+
+import pytest
+
+from src.batch import run_batch
+
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "examples", "sample_statement.csv")
+
+
+def test_run_batch_writes_outputs_and_resumes(tmp_path):
+    out = tmp_path / "out"
+    stats = run_batch([CSV_PATH], str(out), workers=1, fmt="jsonl")
+    assert stats["ok"] == 1 and stats["rows"] > 0
+
+    summaries = (out / "summaries.jsonl").read_text(encoding="utf-8").splitlines()
+    assert "category_summary" in json.loads(summaries[0])
+    assert list(out.glob("transactions-*.jsonl"))
+
+    again = run_batch([CSV_PATH], str(out), workers=1, fmt="jsonl")
+    assert again["skipped"] == 1 and again["ok"] == 0
+
+
+def test_run_batch_parquet_outputs_are_readable(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    out = tmp_path / "out"
+    stats = run_batch([CSV_PATH], str(out), workers=1, fmt="parquet")
+    assert stats["ok"] == 1
+
+    entries = [json.loads(line) for line in (out / "manifest.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert entries[0]["status"] == "ok"
+    table = pq.read_table(entries[0]["output"])
+    assert table.num_rows == stats["rows"]
+    assert not list((out / "transactions").glob("*.tmp"))
@@ -0,0 +1,81 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src import cashflow
+
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "examples", "sample_statement.csv")
+
+
+def _ledger():
+    weekly = pd.date_range("2025-06-01", periods=16, freq="7D")
+    rows = [{"date": d, "description": f"Mercado {i}", "amount": -100.0 - i, "category": "alimentacao"} for i, d in enumerate(weekly)]
+    for d in pd.to_datetime(["2025-06-05", "2025-07-05", "2025-08-04", "2025-09-03"]):
+        rows.append({"date": d, "description": "NETFLIX", "amount": -39.9, "category": "assinatura"})
+    return pd.DataFrame(rows)
+
+
+def test_forecast_cashflow_overlays_recurring(monkeypatch):
+    monkeypatch.setattr(cashflow, "CASHFLOW_WORKERS", 1)
+    result = cashflow.forecast_cashflow(_ledger(), freq="W", steps=6, starting_balance=1000.0)
+
+    assert len(result["periods"]) == 6
+    assert set(result["by_category"]) == {"alimentacao", "assinatura"}
+    # Próxima cobrança da assinatura ~30 dias após a última ocorrência
+    assert [r["date"] for r in result["recurring"]] == ["2025-10-03"]
+    assert sum(result["by_category"]["assinatura"]) == -39.9
+    assert abs(result["balance"][-1] - (1000.0 + sum(result["net"]))) < 0.05
+
+
+def test_forecast_cashflow_rejects_invalid_steps():
+    for steps in (0, -1):
+        with pytest.raises(ValueError):
+            cashflow.forecast_cashflow(_ledger(), steps=steps)
+
+
+def test_cashflow_route_rejects_invalid_steps():
+    import app as app_module
+
+    client = app_module.app.test_client()
+    for steps in ("0", "-1", "x"):
+        with open(CSV_PATH, "rb") as fh:
+            resp = client.post(f"/cashflow?steps={steps}", data={"file": (fh, "sample_statement.csv")}, content_type="multipart/form-data")
+        assert resp.status_code == 400
+        assert "error" in resp.get_json()
+
+
+def test_short_series_skip_process_pool(monkeypatch):
+    def no_pool():
+        raise AssertionError("pool não deveria ser usado")
+
+    monkeypatch.setattr(cashflow, "CASHFLOW_WORKERS", 4)
+    monkeypatch.setattr(cashflow, "_get_executor", no_pool)
+    flows = pd.DataFrame({"a": [-10.0, -20.0, -30.0], "b": [5.0, 5.0, 5.0]})
+
+    result = cashflow._forecast_all(flows, steps=2, order=(1, 0, 0))
+    assert result["a"].tolist() == [-20.0, -20.0]
+    assert result["b"].tolist() == [5.0, 5.0]
+
+
+def test_broken_pool_falls_back_inline_and_is_reset(monkeypatch):
+    from concurrent.futures.process import BrokenProcessPool
+
+    class BrokenPool:
+        def submit(self, *args, **kwargs):
+            raise BrokenProcessPool("worker morreu")
+
+        def shutdown(self, wait=True):
+            pass
+
+    broken = BrokenPool()
+    monkeypatch.setattr(cashflow, "CASHFLOW_WORKERS", 4)
+    monkeypatch.setattr(cashflow, "_executor", broken)
+    monkeypatch.setattr(cashflow, "_forecast_series", lambda values, steps, order: [float(values[-1])] * steps)
+    monkeypatch.setattr(cashflow, "_can_fit", lambda series: True)
+    flows = pd.DataFrame({"a": [1.0, 2.0, 3.0], "b": [4.0, 5.0, 6.0]})
+
+    result = cashflow._forecast_all(flows, steps=2, order=(1, 0, 0))
+    assert result["a"].tolist() == [3.0, 3.0]
+    assert result["b"].tolist() == [6.0, 6.0]
+    assert cashflow._executor is None
@@ -0,0 +1,86 @@
+import os
+
+import pandas as pd
+
+from src import classifier
+from src.categorize import categorize_transactions, rule_categories
+
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "examples", "sample_statement.csv")
+
+
+def test_rule_categories_first_category_wins():
+    desc = pd.Series(["UBER EATS pedido", "Netflix.com", "PIX recebido", None])
+    assert rule_categories(desc).tolist() == ["transporte", "assinatura", "outros", "outros"]
+
+
+def test_classifier_fallback_for_rule_misses(monkeypatch, tmp_path):
+    monkeypatch.setattr(classifier, "MODEL_DIR", str(tmp_path))
+    ledger = pd.DataFrame({
+        "description": ["POSTO SHELL 123", "POSTO IPIRANGA 77", "POSTO BR CENTRO", "PAG ACADEMIA FIT", "ACADEMIA SMART FIT", "MENSAL ACADEMIA"] * 5,
+        "category": ["combustivel", "combustivel", "combustivel", "esporte", "esporte", "esporte"] * 5,
+    })
+    classifier.train_classifier(ledger)
+
+    df = pd.DataFrame({"description": ["POSTO SHELL 999", "ACADEMIA FIT CENTRO", "Uber viagem"], "amount": [-1.0, -2.0, -3.0]})
+    out = categorize_transactions(df)
+    assert out["category"].tolist() == ["combustivel", "esporte", "transporte"]
+    assert categorize_transactions(df, use_model=False)["category"].tolist() == ["outros", "outros", "transporte"]
+
+
+def _training_payload():
+    return {
+        "transactions": [
+            {"description": d, "category": c}
+            for d, c in [
+                ("POSTO SHELL 123", "combustivel"),
+                ("POSTO IPIRANGA 77", "combustivel"),
+                ("POSTO BR CENTRO", "combustivel"),
+                ("PAG ACADEMIA FIT", "esporte"),
+                ("ACADEMIA SMART FIT", "esporte"),
+                ("MENSAL ACADEMIA", "esporte"),
+            ] * 5
+        ]
+    }
+
+
+def _post_statement(client):
+    with open(CSV_PATH, "rb") as fh:
+        data = {"file": (fh, "sample_statement.csv")}
+        return client.post("/statement", data=data, content_type="multipart/form-data", headers={"Accept": "application/json"})
+
+
+def test_categorize_routes(monkeypatch, tmp_path):
+    import app as app_module
+
+    monkeypatch.setattr(classifier, "MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(classifier, "_loaded", {})
+    app_module.statement_cache.clear()
+    client = app_module.app.test_client()
+
+    # Sem modelo treinado: só regras
+    resp = client.post("/categorize", json={"descriptions": ["Uber viagem", "POSTO SHELL 999"]})
+    data = resp.get_json()
+    assert data["categories"] == ["transporte", "outros"]
+    assert data["source"] == ["regra", "nenhuma"]
+    assert data["model_available"] is False
+    assert client.post("/categorize", json={"descriptions": "x"}).status_code == 400
+
+    # Erros de validação do treino
+    assert client.post("/categorize/train", json={}).status_code == 400
+    assert client.post("/categorize/train", json={"transactions": [{"category": "esporte"}]}).status_code == 400
+    single_class = {"transactions": [{"description": "POSTO SHELL", "category": "combustivel"}]}
+    assert client.post("/categorize/train", json=single_class).status_code == 400
+
+    etag_before = _post_statement(client).headers["ETag"]
+
+    resp = client.post("/categorize/train", json=_training_payload())
+    assert resp.status_code == 200
+    assert set(resp.get_json()["classes"]) == {"combustivel", "esporte"}
+
+    data = client.post("/categorize", json={"descriptions": ["Uber viagem", "POSTO SHELL 999"]}).get_json()
+    assert data["categories"] == ["transporte", "combustivel"]
+    assert data["source"] == ["regra", "modelo"]
+    assert data["model_available"] is True
+
+    # O modelo novo muda a versão do classificador e, com ela, o ETag de /statement
+    assert _post_statement(client).headers["ETag"] != etag_before
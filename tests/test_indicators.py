@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from src.indicators import INDICATORS, IndicatorCache
+
+
+def _sample_prices(n=120, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.normal(0, 1, n).cumsum()
+    idx = pd.date_range("2025-01-01", periods=n, freq="h")
+    return pd.DataFrame(
+        {"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 1000.0},
+        index=idx,
+    )
+
+
+def test_incremental_matches_full_computation():
+    df = _sample_prices()
+    for name in INDICATORS:
+        cache = IndicatorCache()
+        cache.compute("AAA", df.iloc[:80], name)
+        incremental = cache.compute("AAA", df, name)
+        full = IndicatorCache().compute("AAA", df, name)
+        pd.testing.assert_frame_equal(incremental, full, check_freq=False)
+
+        # Última barra revisada (candle ainda em formação) deve ser reprocessada
+        revised = df.copy()
+        revised.iloc[-1, revised.columns.get_indexer(["high", "low", "close"])] += 50
+        incremental = cache.compute("AAA", revised, name)
+        full = IndicatorCache().compute("AAA", revised, name)
+        pd.testing.assert_frame_equal(incremental, full, check_freq=False)
+
+
+def test_incremental_with_missing_close_matches_full():
+    df = _sample_prices()
+    df.iloc[79, df.columns.get_loc("close")] = np.nan
+    for name in ("ema", "rsi", "macd"):
+        cache = IndicatorCache()
+        cache.compute("AAA", df.iloc[:80], name)
+        incremental = cache.compute("AAA", df, name)
+        full = IndicatorCache().compute("AAA", df, name)
+        pd.testing.assert_frame_equal(incremental, full, check_freq=False)
+
+
+def test_compute_many_matches_single_symbol():
+    frames = {"AAA": _sample_prices(seed=1), "BBB": _sample_prices(seed=2)}
+    many = IndicatorCache().compute_many(frames, "macd")
+    single = IndicatorCache().compute("BBB", frames["BBB"], "macd")
+    pd.testing.assert_frame_equal(many["BBB"], single, check_freq=False, check_names=False)
+
+
+def test_indicators_route_tail_param(monkeypatch):
+    import app as app_module
+
+    monkeypatch.setattr(app_module, "get_stock_data", lambda **kwargs: _sample_prices())
+    client = app_module.app.test_client()
+
+    assert client.get("/indicators?symbols=AAA&names=sma&tail=x").status_code == 400
+    for tail in ("0", "-3"):
+        data = client.get(f"/indicators?symbols=AAA&names=sma&tail={tail}").get_json()
+        assert len(data["AAA"]["sma"]["sma"]) == 1
+
+
+def test_cache_evicts_least_recently_used():
+    cache = IndicatorCache(max_entries=2)
+    df = _sample_prices()
+    cache.compute("AAA", df, "sma")
+    cache.compute("BBB", df, "sma")
+    cache.compute("AAA", df, "sma")
+    cache.compute("CCC", df, "sma")
+
+    assert [key[0] for key in cache._entries] == ["AAA", "CCC"]
+
+
+def test_default_params_share_cache_entry():
+    cache = IndicatorCache()
+    df = _sample_prices()
+    cache.compute("AAA", df, "sma", window=20)
+    cache.compute_many({"AAA": df}, "sma")
+
+    assert list(cache._entries) == [("AAA", "sma", (("window", 20),))]
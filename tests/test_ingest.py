@@ -0,0 +1,17 @@
+import pandas as pd
+
+from src import ingest
+
+
+def test_price_cache_is_bounded_and_drops_expired(monkeypatch):
+    monkeypatch.setattr(ingest, "_price_cache", ingest.OrderedDict())
+    monkeypatch.setattr(ingest, "PRICE_CACHE_SIZE", 2)
+    df = pd.DataFrame({"close": [1.0]})
+
+    for symbol in ("AAA", "BBB", "CCC"):
+        ingest._store_prices((symbol, "60min", "compact"), df)
+    assert [key[0] for key in ingest._price_cache] == ["BBB", "CCC"]
+
+    monkeypatch.setattr(ingest, "PRICE_CACHE_TTL", 0)
+    assert ingest._cached_prices(("CCC", "60min", "compact")) is None
+    assert ("CCC", "60min", "compact") not in ingest._price_cache
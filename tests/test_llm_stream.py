@@ -0,0 +1,88 @@
+import numpy as np
+import openai
+import pandas as pd
+
+import app as app_module
+from src.llm import generate_financial_summary
+
+
+def _fake_stream_create(**kwargs):
+    """Backend falso: devolve a resposta em fragmentos como a API com stream=True."""
+    assert kwargs.get("stream") is True
+    for piece in ["Resumo ", "neutro. ", "Poupe 10%."]:
+        yield {"choices": [{"delta": {"content": piece}}]}
+    yield {"choices": [{"delta": {}}]}
+
+
+def test_generate_financial_summary_stream(monkeypatch):
+    monkeypatch.setattr(openai, "api_key", "test")
+    monkeypatch.setattr(openai.ChatCompletion, "create", _fake_stream_create)
+
+    tokens = list(generate_financial_summary("texto", stream=True))
+    assert tokens == ["Resumo ", "neutro. ", "Poupe 10%."]
+
+
+def _prices():
+    idx = pd.date_range("2025-01-01", periods=60, freq="h")
+    close = 100 + np.arange(60, dtype=float)
+    return pd.DataFrame({"open": close, "high": close, "low": close, "close": close, "volume": 1.0}, index=idx)
+
+
+def _events(resp):
+    body = resp.get_data(as_text=True)
+    return [line.split(": ", 1)[1] for line in body.splitlines() if line.startswith("event: ")]
+
+
+def test_analysis_stream_event_order(monkeypatch):
+    prices = _prices()
+
+    monkeypatch.setattr(openai, "api_key", "test")
+    monkeypatch.setattr(openai.ChatCompletion, "create", _fake_stream_create)
+    monkeypatch.setattr(app_module, "get_stock_data", lambda **kwargs: prices)
+    monkeypatch.setattr(
+        app_module,
+        "arima_forecast",
+        lambda series, steps: (pd.Series([1.0] * steps), pd.DataFrame({"lower": [0.0] * steps, "upper": [2.0] * steps})),
+    )
+
+    client = app_module.app.test_client()
+    resp = client.get("/analysis/stream?symbol=TEST&steps=2")
+
+    assert resp.mimetype == "text/event-stream"
+    assert _events(resp) == ["start", "prices", "forecast", "token", "token", "token", "done"]
+
+
+def test_analysis_stream_forecast_error_ends_stream(monkeypatch):
+    def failing_forecast(series, steps):
+        raise ValueError("falha no ajuste")
+
+    monkeypatch.setattr(app_module, "get_stock_data", lambda **kwargs: _prices())
+    monkeypatch.setattr(app_module, "arima_forecast", failing_forecast)
+
+    resp = app_module.app.test_client().get("/analysis/stream?symbol=TEST&steps=2")
+    assert _events(resp) == ["start", "prices", "error", "done"]
+
+
+def test_analysis_stream_llm_error_emits_error_event(monkeypatch):
+    def failing_create(**kwargs):
+        raise RuntimeError("backend indisponível")
+
+    monkeypatch.setattr(openai, "api_key", "test")
+    monkeypatch.setattr(openai.ChatCompletion, "create", failing_create)
+    monkeypatch.setattr(app_module, "get_stock_data", lambda **kwargs: _prices())
+    monkeypatch.setattr(
+        app_module,
+        "arima_forecast",
+        lambda series, steps: (pd.Series([1.0] * steps), pd.DataFrame({"lower": [0.0] * steps, "upper": [2.0] * steps})),
+    )
+
+    resp = app_module.app.test_client().get("/analysis/stream?symbol=TEST&steps=2")
+    assert _events(resp) == ["start", "prices", "forecast", "error", "done"]
+
+
+def test_analysis_stream_rejects_invalid_steps():
+    client = app_module.app.test_client()
+    for steps in ("x", "0", "-2"):
+        resp = client.get(f"/analysis/stream?symbol=TEST&steps={steps}")
+        assert resp.status_code == 400
+        assert "error" in resp.get_json()
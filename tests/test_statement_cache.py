@@ -0,0 +1,35 @@
+import os
+
+import app as app_module
+
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "examples", "sample_statement.csv")
+
+
+def _post(client, headers=None):
+    with open(CSV_PATH, "rb") as fh:
+        data = {"file": (fh, "sample_statement.csv")}
+        return client.post("/statement", data=data, content_type="multipart/form-data", headers=headers or {})
+
+
+def test_statement_cached_and_etag(monkeypatch):
+    calls = []
+    original = app_module.analyze_statement
+    monkeypatch.setattr(app_module, "analyze_statement", lambda df: calls.append(1) or original(df))
+    app_module.statement_cache.clear()
+    client = app_module.app.test_client()
+
+    first = _post(client, {"Accept": "application/json"})
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    second = _post(client, {"Accept": "application/json"})
+    assert second.get_data() == first.get_data()
+    assert len(calls) == 1
+
+    not_modified = _post(client, {"Accept": "application/json", "If-None-Match": etag})
+    assert not_modified.status_code == 304
+
+    html = _post(client, {"Accept": "text/html"})
+    assert html.mimetype == "text/html"
+    assert html.headers["ETag"] != etag
+    assert len(calls) == 2